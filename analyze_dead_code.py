@@ -3,12 +3,84 @@
 Analyse du code mort et des duplications
 """
 
+import mmap
 import os
 import re
+import sys
 from pathlib import Path
-from collections import defaultdict
+from collections import defaultdict, Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
 import json
 
+from dart_files import iter_dart_files
+
+# Patterns over bytes: Dart syntax is ASCII, so files are scanned straight
+# from the page cache and only captured groups get decoded
+_IMPORT_RE = re.compile(rb"import\s+['\"]([^'\"]+)['\"]")
+_EXPORT_RE = re.compile(rb"export\s+['\"]([^'\"]+)['\"]")
+_CLASS_RE = re.compile(rb"class\s+(\w+)(?:\s+extends|\s+implements|\s+with|\s*\{)")
+_FUNC_RE = re.compile(rb'((?:Future|void|int|String|bool|List|Map|dynamic)\s+\w+\s*\([^)]*\))')
+_WORD_RE = re.compile(rb'\w+')
+
+
+class FileRec(NamedTuple):
+    """A scanned file, with the path variants derived once at discovery"""
+    path: str      # relative to the project root, as reported
+    basename: str
+    full: str      # path to open
+
+
+def _decode(value):
+    return value.decode('utf-8', 'ignore')
+
+
+def _scan_file(full_path):
+    """Scan one Dart file (top-level so it can run in a worker process)"""
+    # Only the read is guarded: a bug in _scan_content must not silently
+    # drop the file from every aggregate
+    try:
+        with open(full_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # mmap refuses empty files
+                content = None
+            else:
+                # The mapping keeps its own handle once the file is closed
+                content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except OSError:
+        return None
+
+    if content is None:
+        return _scan_content(b'')
+    with content:
+        return _scan_content(content)
+
+
+def _scan_content(content):
+    """Extract everything the analyzer aggregates from raw file bytes"""
+    # Find imports
+    imports = [
+        import_path for import_path in map(_decode, _IMPORT_RE.findall(content))
+        if not import_path.startswith('package:flutter') and not import_path.startswith('dart:')
+    ]
+
+    # Find function signatures
+    signatures = []
+    for signature in _FUNC_RE.findall(content):
+        # Normalize signature (split() also drops leading/trailing whitespace)
+        signatures.append(' '.join(_decode(signature).split()))
+
+    return {
+        'imports': imports,
+        'exports': [_decode(path) for path in _EXPORT_RE.findall(content)],
+        'classes': [_decode(name) for name in _CLASS_RE.findall(content)],
+        'signatures': signatures,
+        # Identifiers referenced by the file, so usages can be counted once
+        # every class is known without reading the file again
+        'words': {_decode(word) for word in set(_WORD_RE.findall(content))},
+    }
+
+
 class DeadCodeAnalyzer:
     def __init__(self, project_root):
         self.project_root = Path(project_root)
@@ -19,58 +91,68 @@ class DeadCodeAnalyzer:
         self.class_definitions = defaultdict(list)
         self.class_usages = defaultdict(int)
         self.function_definitions = defaultdict(list)
+        self.signature_counts = Counter()
+        self.signature_files = defaultdict(set)
+        self.word_files = Counter()
         self.duplications = []
 
     def scan_files(self):
         """Scan all Dart files"""
-        lib_path = self.project_root / 'lib'
-        if lib_path.exists():
-            for dart_file in lib_path.rglob('*.dart'):
-                relative = str(dart_file.relative_to(self.project_root))
-                self.lib_files.append(relative)
-
-        test_path = self.project_root / 'test'
-        if test_path.exists():
-            for dart_file in test_path.rglob('*.dart'):
-                relative = str(dart_file.relative_to(self.project_root))
-                self.test_files.append(relative)
+        for dart_file, relative in iter_dart_files(self.project_root, 'lib'):
+            self.lib_files.append(self._file_rec(dart_file, relative))
+
+        for dart_file, relative in iter_dart_files(self.project_root, 'test'):
+            self.test_files.append(self._file_rec(dart_file, relative))
+
+    @staticmethod
+    def _file_rec(dart_file, relative):
+        relative = sys.intern(relative)
+        return FileRec(
+            path=relative,
+            basename=os.path.basename(relative),
+            full=dart_file,
+        )
 
     def analyze_imports_exports(self):
         """Analyze imports and exports in files"""
+        self._scan_all()
+
+    def _scan_all(self):
+        """Single pass feeding every finder: imports, exports, classes, signatures"""
         all_files = self.lib_files + self.test_files
+        full_paths = [rec.full for rec in all_files]
+
+        with ProcessPoolExecutor() as executor:
+            results = executor.map(_scan_file, full_paths, chunksize=32)
+            for rec, result in zip(all_files, results):
+                if result is not None:
+                    self._merge_scan(rec.path, result)
+
+        self._count_usages()
 
-        for file_path in all_files:
-            full_path = self.project_root / file_path
-            try:
-                with open(full_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-
-                # Find imports
-                import_pattern = r"import\s+['\"]([^'\"]+)['\"]"
-                for match in re.finditer(import_pattern, content):
-                    import_path = match.group(1)
-                    if not import_path.startswith('package:flutter') and not import_path.startswith('dart:'):
-                        self.imports[file_path].add(import_path)
-
-                # Find exports
-                export_pattern = r"export\s+['\"]([^'\"]+)['\"]"
-                for match in re.finditer(export_pattern, content):
-                    export_path = match.group(1)
-                    self.exports[file_path].add(export_path)
-
-                # Find class definitions
-                class_pattern = r"class\s+(\w+)(?:\s+extends|\s+implements|\s+with|\s*\{)"
-                for match in re.finditer(class_pattern, content):
-                    class_name = match.group(1)
-                    self.class_definitions[class_name].append(file_path)
-
-                # Find class usages (simplified)
-                for class_name in self.class_definitions.keys():
-                    if re.search(r'\b' + class_name + r'\b', content):
-                        self.class_usages[class_name] += 1
-
-            except Exception as e:
-                pass
+    def _merge_scan(self, file_path, result):
+        """Merge one file's scan result into the aggregates"""
+        self.imports[file_path].update(result['imports'])
+        self.exports[file_path].update(result['exports'])
+
+        # Names come back from worker processes as fresh strings: intern them
+        # so repeated keys share one object and hash/compare by identity
+        for class_name in result['classes']:
+            self.class_definitions[sys.intern(class_name)].append(file_path)
+
+        for signature in result['signatures']:
+            signature = sys.intern(signature)
+            self.signature_counts[signature] += 1
+            self.signature_files[signature].add(file_path)
+
+        self.word_files.update(result['words'])
+
+    def _count_usages(self):
+        """Count files referencing each known class (simplified)"""
+        for class_name in self.class_definitions:
+            count = self.word_files.get(class_name, 0)
+            if count:
+                self.class_usages[class_name] = count
 
     def find_unused_files(self):
         """Find files that are never imported"""
@@ -81,7 +163,19 @@ class DeadCodeAnalyzer:
         for imports in self.imports.values():
             all_imports.update(imports)
 
-        for file_path in self.lib_files:
+        # Index import suffixes once: import paths end with the file name, so
+        # "name in import" is a suffix test and becomes O(1). A basename can
+        # only match inside the last segment. This test also subsumes the old
+        # relative-path substring test: a path ending an import implies its
+        # basename ends the import's last segment
+        name_suffixes = set()
+        for imp in all_imports:
+            last_segment = imp.rsplit('/', 1)[-1]
+            name_suffixes.update(last_segment[i:] for i in range(len(last_segment)))
+
+        for rec in self.lib_files:
+            file_path = rec.path
+
             # Skip generated files
             if '.g.dart' in file_path or '.mocks.dart' in file_path:
                 continue
@@ -95,13 +189,7 @@ class DeadCodeAnalyzer:
                 continue
 
             # Check if file is imported
-            file_name = os.path.basename(file_path)
-            is_imported = False
-
-            for imp in all_imports:
-                if file_name in imp or file_path.replace('\\', '/') in imp:
-                    is_imported = True
-                    break
+            is_imported = rec.basename in name_suffixes
 
             if not is_imported:
                 unused.append(file_path)
@@ -128,98 +216,84 @@ class DeadCodeAnalyzer:
     def find_duplications(self):
         """Find potential code duplications (simplified)"""
         # This is a simplified version - looks for similar function signatures
-        signatures = defaultdict(list)
-
-        all_files = self.lib_files + self.test_files
-
-        for file_path in all_files:
-            full_path = self.project_root / file_path
-            try:
-                with open(full_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-
-                # Find function signatures
-                func_pattern = r'((?:Future|void|int|String|bool|List|Map|dynamic)\s+\w+\s*\([^)]*\))'
-                for match in re.finditer(func_pattern, content):
-                    signature = match.group(1).strip()
-                    # Normalize signature
-                    normalized = re.sub(r'\s+', ' ', signature)
-                    signatures[normalized].append(file_path)
-
-            except Exception as e:
-                pass
-
-        # Find duplicates
-        duplicates = []
-        for sig, files in signatures.items():
-            if len(files) > 2 and len(sig) > 30:  # Skip very short signatures
-                duplicates.append({
-                    'signature': sig,
-                    'files': list(set(files)),
-                    'count': len(files)
-                })
-
-        return sorted(duplicates, key=lambda x: x['count'], reverse=True)[:30]
-
-    def generate_report(self):
-        """Generate dead code report"""
+        # collected by _scan_all()
+        duplicates = [
+            {
+                'signature': sig,
+                'files': list(self.signature_files[sig]),
+                'count': count
+            }
+            for sig, count in self.signature_counts.most_common()
+            if count > 2 and len(sig) > 30  # Skip very short signatures
+        ]
+
+        return duplicates[:30]
+
+    def _iter_report_lines(self):
+        """Yield the dead code report line by line"""
         self.scan_files()
-        self.analyze_imports_exports()
+        self._scan_all()
 
         unused_files = self.find_unused_files()
         unused_classes = self.find_unused_classes()
         duplications = self.find_duplications()
 
-        report = []
-        report.append("=" * 80)
-        report.append("ANALYSE DU CODE MORT ET DUPLICATIONS")
-        report.append("=" * 80)
-        report.append("")
+        yield "=" * 80
+        yield "ANALYSE DU CODE MORT ET DUPLICATIONS"
+        yield "=" * 80
+        yield ""
 
         # Unused files
-        report.append(f"### C. CODE MORT DÉTECTÉ ({len(unused_files)} fichiers)")
-        report.append("")
-        report.append("| Fichier | Type | Raison |")
-        report.append("|---------|------|--------|")
+        yield f"### C. CODE MORT DÉTECTÉ ({len(unused_files)} fichiers)"
+        yield ""
+        yield "| Fichier | Type | Raison |"
+        yield "|---------|------|--------|"
 
         for file in unused_files[:50]:
-            report.append(f"| {file} | Fichier | Jamais importé |")
+            yield f"| {file} | Fichier | Jamais importé |"
 
-        report.append("")
+        yield ""
 
         # Unused classes
-        report.append(f"### Classes peu utilisées ({len(unused_classes)} classes)")
-        report.append("")
-        report.append("| Classe | Fichier | Utilisations |")
-        report.append("|--------|---------|--------------|")
+        yield f"### Classes peu utilisées ({len(unused_classes)} classes)"
+        yield ""
+        yield "| Classe | Fichier | Utilisations |"
+        yield "|--------|---------|--------------|"
 
         for item in unused_classes[:50]:
             files_str = ', '.join(item['defined_in'][:2])
             if len(item['defined_in']) > 2:
                 files_str += '...'
-            report.append(f"| {item['class']} | {files_str} | {item['usage_count']} |")
+            yield f"| {item['class']} | {files_str} | {item['usage_count']} |"
 
-        report.append("")
+        yield ""
 
         # Duplications
-        report.append(f"### D. DUPLICATIONS POTENTIELLES ({len(duplications)} patterns)")
-        report.append("")
-        report.append("| Signature | Fichiers | Occurrences |")
-        report.append("|-----------|----------|-------------|")
+        yield f"### D. DUPLICATIONS POTENTIELLES ({len(duplications)} patterns)"
+        yield ""
+        yield "| Signature | Fichiers | Occurrences |"
+        yield "|-----------|----------|-------------|"
 
         for dup in duplications:
             files_str = f"{len(dup['files'])} fichiers"
             sig_short = dup['signature'][:60] + '...' if len(dup['signature']) > 60 else dup['signature']
-            report.append(f"| {sig_short} | {files_str} | {dup['count']} |")
+            yield f"| {sig_short} | {files_str} | {dup['count']} |"
 
-        report.append("")
+        yield ""
 
-        return "\n".join(report)
+    def write_report(self, out):
+        """Stream the dead code report to a writable text stream"""
+        for line in self._iter_report_lines():
+            out.write(line)
+            out.write('\n')
+
+    def generate_report(self):
+        """Generate dead code report"""
+        return "\n".join(self._iter_report_lines())
 
 if __name__ == '__main__':
     project_path = r'C:\Users\Thibaut\Desktop\PriorisProject'
     analyzer = DeadCodeAnalyzer(project_path)
 
     print("Analyse du code mort en cours...")
-    report = analyzer.generate_report()
-    print(report)
+    analyzer.write_report(sys.stdout)
@@ -4,12 +4,26 @@ Script pour analyser les méthodes Dart >50 lignes dans le projet
 Conforme aux exigences CLAUDE.md
 """
 
+import heapq
 import re
 import os
-from pathlib import Path
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from typing import List, Tuple
 
+from dart_files import walk_dart
+
+# Pattern pour détecter le début d'une méthode
+_METHOD_RE = re.compile(
+    r'^\s*(?:@override\s+)?'  # Optional @override
+    r'(?:static\s+|final\s+|const\s+)?'  # Optional modifiers
+    r'(?:Future<[^>]+>|Stream<[^>]+>|Widget|void|bool|int|double|String|List|Map|Set|[A-Z]\w*)\s+'  # Return type
+    r'(\w+)\s*'  # Method name (captured)
+    r'\([^)]*\)'  # Parameters
+    r'\s*(?:async)?\s*\{'  # Opening brace
+)
+
 @dataclass
 class MethodInfo:
     file_path: str
@@ -18,11 +32,13 @@ class MethodInfo:
     end_line: int
     line_count: int
 
-def find_dart_files(root_dir: str = "lib") -> List[Path]:
+def find_dart_files(root_dir: str = "lib") -> List[str]:
     """Trouve tous les fichiers .dart dans le répertoire"""
-    return list(Path(root_dir).rglob("*.dart"))
+    if not os.path.isdir(root_dir):
+        return []
+    return list(walk_dart(root_dir))
 
-def analyze_method_sizes(file_path: Path) -> List[MethodInfo]:
+def analyze_method_sizes(file_path: str) -> List[MethodInfo]:
     """Analyse un fichier pour trouver les méthodes >50 lignes"""
     methods = []
 
@@ -33,20 +49,10 @@ def analyze_method_sizes(file_path: Path) -> List[MethodInfo]:
         print(f"Erreur lecture {file_path}: {e}")
         return methods
 
-    # Pattern pour détecter le début d'une méthode
-    method_pattern = re.compile(
-        r'^\s*(?:@override\s+)?'  # Optional @override
-        r'(?:static\s+|final\s+|const\s+)?'  # Optional modifiers
-        r'(?:Future<[^>]+>|Stream<[^>]+>|Widget|void|bool|int|double|String|List|Map|Set|[A-Z]\w*)\s+'  # Return type
-        r'(\w+)\s*'  # Method name (captured)
-        r'\([^)]*\)'  # Parameters
-        r'\s*(?:async)?\s*\{'  # Opening brace
-    )
-
     i = 0
     while i < len(lines):
         line = lines[i]
-        match = method_pattern.match(line)
+        match = _METHOD_RE.match(line)
 
         if match:
             method_name = match.group(1)
@@ -58,13 +64,19 @@ def analyze_method_sizes(file_path: Path) -> List[MethodInfo]:
             # Commencer après la première ligne (qui contient déjà une {)
             j += 1
             while j < len(lines) and brace_count > 0:
-                for char in lines[j]:
-                    if char == '{':
-                        brace_count += 1
-                    elif char == '}':
-                        brace_count -= 1
-                        if brace_count == 0:
-                            break
+                line = lines[j]
+                closing = line.count('}')
+                if brace_count - closing > 0:
+                    # La méthode ne peut pas se fermer sur cette ligne
+                    brace_count += line.count('{') - closing
+                else:
+                    for char in line:
+                        if char == '{':
+                            brace_count += 1
+                        elif char == '}':
+                            brace_count -= 1
+                            if brace_count == 0:
+                                break
                 j += 1
 
             end_line = j  # 1-indexed
@@ -94,9 +106,10 @@ def main():
 
     print(f"Fichiers Dart trouves: {len(dart_files)}\n")
 
-    for file_path in dart_files:
-        methods = analyze_method_sizes(file_path)
-        all_methods.extend(methods)
+    # Fichiers indépendants : analyse répartie sur tous les coeurs
+    with ProcessPoolExecutor() as executor:
+        for methods in executor.map(analyze_method_sizes, dart_files, chunksize=32):
+            all_methods.extend(methods)
 
     # Trier par nombre de lignes (décroissant)
     all_methods.sort(key=lambda m: m.line_count, reverse=True)
@@ -124,15 +137,13 @@ def main():
     print(f"   - Moyenne: {sum(m.line_count for m in all_methods) / len(all_methods):.1f} lignes")
 
     # Grouper par fichier
-    by_file = {}
+    by_file = defaultdict(list)
     for method in all_methods:
-        if method.file_path not in by_file:
-            by_file[method.file_path] = []
         by_file[method.file_path].append(method)
 
     print(f"\nFichiers avec le plus de violations:")
-    sorted_files = sorted(by_file.items(), key=lambda x: len(x[1]), reverse=True)
-    for file_path, methods in sorted_files[:10]:
+    sorted_files = heapq.nlargest(10, by_file.items(), key=lambda x: len(x[1]))
+    for file_path, methods in sorted_files:
         rel_path = file_path.replace("lib\\", "").replace("lib/", "")
         print(f"   - {rel_path}: {len(methods)} methode(s)")
 
@@ -7,11 +7,144 @@ import os
 import re
 from pathlib import Path
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+import heapq
 import json
+import sys
+from operator import itemgetter
+from typing import Optional, Union
+
+from dart_files import iter_dart_files
+
+# Espaces reconnus par \s, sauf le saut de ligne : les motifs ci-dessous
+# s'appliquent au contenu entier mais ne doivent jamais déborder d'une ligne
+_HSPACE = '\t\x0b\x0c\r\x1c-\x20\x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000'
+
+# Pattern pour détecter les méthodes/fonctions
+# Simplifié pour Dart: cherche des patterns comme "void methodName(", "String methodName(", etc.
+_METHOD_START_RE = re.compile(
+    rf'^[{_HSPACE}]*(?:[\w<>?,{_HSPACE}]+)[{_HSPACE}]+(\w+)[{_HSPACE}]*\([^)\n]*\)'
+    rf'[{_HSPACE}]*(?:async|sync\*)?[{_HSPACE}]*\{{',
+    re.MULTILINE
+)
+
+# Ligne ni vide ni commentaire (// ou /*)
+_CODE_LINE_RE = re.compile(r'^[^\S\n]*(?!//|/\*)\S', re.MULTILINE)
+_BRACE_RE = re.compile(r'[{}]')
+
+# Cache des résultats par fichier, invalidé si la logique d'analyse change
+_CACHE_FILE = '.analysis_cache.json'
+_CACHE_VERSION = 2
+
+# Fichiers générés, exclus de l'analyse
+_EXCLUDED_SUFFIXES = ('.g.dart', '.freezed.dart', '.mocks.dart', '_config.dart')
+_EXCLUDED_PREFIXES = (
+    'lib/l10n/',
+    'lib/generated/',
+    'lib/.dart_tool/',
+    'test/.dart_tool/',
+    'test/domain/services/persistence/unified_persistence_service_test.dart',
+)
+
+
+class FileScore:
+    """Score d'impact cumulé d'un fichier pour le classement des priorités"""
+    __slots__ = ('score', 'lines', 'violations')
+
+    def __init__(self):
+        self.score = 0
+        self.lines = 0
+        self.violations = []
+
+
+def _line_end(content, pos):
+    end = content.find('\n', pos)
+    return len(content) if end == -1 else end
+
+
+def _brace_delta(content, start, end):
+    return content.count('{', start, end) - content.count('}', start, end)
+
+
+def _find_method_end(content, pos, brace_count):
+    """Offset de fin de la ligne qui ramène le compte d'accolades à zéro.
+
+    pos est le début de la ligne qui suit la signature. Les lignes vides ou de
+    commentaire sont ignorées et l'équilibre n'est vérifié qu'en fin de ligne,
+    comme dans un parcours ligne à ligne. None si la méthode n'est jamais fermée.
+    """
+    if brace_count == 0:
+        # Signature déjà équilibrée : la prochaine ligne de code décide
+        code_line = _CODE_LINE_RE.search(content, pos)
+        if code_line is None:
+            return None
+        start = code_line.start()
+        end = _line_end(content, start)
+        brace_count = _brace_delta(content, start, end)
+        if brace_count == 0:
+            return end
+        pos = end + 1
+
+    # Seules les lignes contenant une accolade peuvent changer l'équilibre
+    while True:
+        brace = _BRACE_RE.search(content, pos)
+        if brace is None:
+            return None
+        start = content.rfind('\n', 0, brace.start()) + 1
+        end = _line_end(content, brace.start())
+        if _CODE_LINE_RE.match(content, start):
+            brace_count += _brace_delta(content, start, end)
+            if brace_count == 0:
+                return end
+        pos = end + 1
+
+
+def _find_long_methods(content):
+    """Retourne (nom, début, fin, longueur) des méthodes de plus de 50 lignes"""
+    methods = []
+    line_pos, line_no = 0, 1
+
+    # Recherche reprise après chaque méthode : le corps n'est jamais re-testé
+    match = _METHOD_START_RE.search(content)
+    while match is not None:
+        start = match.start()
+        line_no += content.count('\n', line_pos, start)
+        line_pos = start
+
+        first_end = _line_end(content, start)
+        end = _find_method_end(content, first_end + 1, _brace_delta(content, start, first_end))
+        if end is None:
+            break
+
+        end_line = line_no + content.count('\n', start, end)
+        method_length = end_line - line_no + 1
+        if method_length > 50:
+            methods.append((match.group(1), line_no, end_line, method_length))
+
+        match = _METHOD_START_RE.search(content, end + 1)
+
+    return methods
+
+
+def _scan_file(file_path):
+    """Analyse un fichier Dart (fonction de module pour les processus workers)"""
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        content = f.read()
+
+    # Une dernière ligne sans '\n' final compte aussi, mais pas la "ligne" vide
+    # qui suit le '\n' final
+    line_count = content.count('\n') + (1 if content and not content.endswith('\n') else 0)
+
+    return {
+        'line_count': line_count,
+        'methods_over_50': _find_long_methods(content),
+    }
+
 
 class ProjectAnalyzer:
-    def __init__(self, project_root):
+    def __init__(self, project_root, cache_path=None):
         self.project_root = Path(project_root)
+        self.cache_path = Path(cache_path) if cache_path else self.project_root / _CACHE_FILE
         self.violations = defaultdict(list)
         self.stats = {
             'total_files': 0,
@@ -20,26 +153,22 @@ class ProjectAnalyzer:
             'total_lines': 0
         }
 
-    def is_excluded(self, file_path: Path) -> bool:
-        """Determine if a file should be excluded from analysis (generated/tests)."""
-        relative = file_path.relative_to(self.project_root).as_posix()
-
-        generated_patterns = [
-            'lib/l10n/',
-            'lib/generated/',
-            'lib/.dart_tool/',
-            'test/.dart_tool/',
-            'test/domain/services/persistence/unified_persistence_service_test.dart',
-        ]
+    def is_excluded(self, file_path: Union[Path, str], relative: Optional[str] = None) -> bool:
+        """Determine if a file should be excluded from analysis (generated/tests).
 
-        filename = file_path.name
-        if filename.endswith(('.g.dart', '.freezed.dart', '.mocks.dart', '_config.dart')):
+        ``relative`` is the posix path from the project root, when the caller
+        already has it.
+        """
+        filename = os.path.basename(file_path)
+        if filename.endswith(_EXCLUDED_SUFFIXES):
             return True
 
+        if relative is None:
+            relative = Path(file_path).relative_to(self.project_root).as_posix()
+
         # Skip generated localization files
-        for pattern in generated_patterns:
-            if relative.startswith(pattern):
-                return True
+        if relative.startswith(_EXCLUDED_PREFIXES):
+            return True
 
         # Skip mockito generated folders
         if '/regression/' in relative and filename.endswith('.dart'):
@@ -49,15 +178,16 @@ class ProjectAnalyzer:
 
     def analyze_file(self, file_path):
         """Analyse un fichier Dart"""
-        if self.is_excluded(file_path):
+        relative = file_path.relative_to(self.project_root)
+        if self.is_excluded(file_path, relative.as_posix()):
             return
 
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-            lines = content.split('\n')
+        self._record_scan(str(relative), _scan_file(file_path))
 
-        relative_path = file_path.relative_to(self.project_root)
-        line_count = len(lines)
+    def _record_scan(self, relative_path, result):
+        """Intègre le résultat d'analyse d'un fichier aux statistiques"""
+        relative_path = sys.intern(relative_path)
+        line_count = result['line_count']
 
         self.stats['total_files'] += 1
         self.stats['total_lines'] += line_count
@@ -66,150 +196,180 @@ class ProjectAnalyzer:
         if line_count > 500:
             self.stats['files_over_500'] += 1
             self.violations['files_over_500'].append({
-                'file': str(relative_path),
+                'file': relative_path,
                 'lines': line_count,
                 'excess': line_count - 500
             })
 
-        # Analyser les méthodes
-        self.analyze_methods(str(relative_path), content, lines)
+        self._record_methods(relative_path, result['methods_over_50'])
 
-    def analyze_methods(self, file_path, content, lines):
+    def analyze_methods(self, file_path, content):
         """Analyse les méthodes d'un fichier"""
-        # Pattern pour détecter les méthodes/fonctions
-        # Simplifié pour Dart: cherche des patterns comme "void methodName(", "String methodName(", etc.
-        method_pattern = r'^\s*(?:[\w<>?,\s]+)\s+(\w+)\s*\([^)]*\)\s*(?:async|sync\*)?\s*\{'
-
-        in_method = False
-        method_name = None
-        method_start = 0
-        brace_count = 0
-
-        for i, line in enumerate(lines, 1):
-            # Ignorer les commentaires et les lignes vides
-            stripped = line.strip()
-            if not stripped or stripped.startswith('//') or stripped.startswith('/*'):
-                continue
-
-            # Détection de début de méthode
-            match = re.match(method_pattern, line)
-            if match and not in_method:
-                method_name = match.group(1)
-                method_start = i
-                in_method = True
-                brace_count = line.count('{') - line.count('}')
-            elif in_method:
-                brace_count += line.count('{') - line.count('}')
-
-                # Fin de méthode
-                if brace_count == 0:
-                    method_length = i - method_start + 1
-
-                    if method_length > 50:
-                        self.stats['methods_over_50'] += 1
-                        self.violations['methods_over_50'].append({
-                            'file': file_path,
-                            'method': method_name,
-                            'lines': method_length,
-                            'start_line': method_start,
-                            'end_line': i
-                        })
-
-                    in_method = False
-                    method_name = None
-                    brace_count = 0
+        self._record_methods(file_path, _find_long_methods(content))
+
+    def _record_methods(self, file_path, methods):
+        """Enregistre les méthodes de plus de 50 lignes d'un fichier"""
+        for method_name, start_line, end_line, method_length in methods:
+            self.stats['methods_over_50'] += 1
+            self.violations['methods_over_50'].append({
+                'file': file_path,
+                'method': method_name,
+                'lines': method_length,
+                'start_line': start_line,
+                'end_line': end_line
+            })
 
     def analyze_project(self):
         """Analyse tous les fichiers Dart du projet"""
-        # Analyser lib/
-        lib_path = self.project_root / 'lib'
-        if lib_path.exists():
-            for dart_file in lib_path.rglob('*.dart'):
-                self.analyze_file(dart_file)
-
-        # Analyser test/
-        test_path = self.project_root / 'test'
-        if test_path.exists():
-            for dart_file in test_path.rglob('*.dart'):
-                self.analyze_file(dart_file)
-
-    def generate_report(self):
-        """Génère le rapport d'analyse"""
-        report = []
-        report.append("=" * 80)
-        report.append("RAPPORT D'ANALYSE DE CONFORMITÉ CLAUDE.MD")
-        report.append("=" * 80)
-        report.append("")
+        dart_files = []
+        relative_paths = []
+
+        # Analyser lib/ puis test/, en écartant les fichiers générés avant lecture
+        for folder in ('lib', 'test'):
+            for dart_file, relative in iter_dart_files(self.project_root, folder):
+                if self.is_excluded(dart_file, relative.replace(os.sep, '/')):
+                    continue
+                dart_files.append(dart_file)
+                relative_paths.append(relative)
+
+        # Réutiliser le résultat des fichiers inchangés depuis le dernier passage
+        cache = self._load_cache()
+        fresh_cache = {}
+        results = [None] * len(dart_files)
+        stale = []
+        for index, (dart_file, relative_path) in enumerate(zip(dart_files, relative_paths)):
+            st = os.stat(dart_file)
+            signature = [st.st_mtime_ns, st.st_size]
+            entry = cache.get(relative_path)
+            if entry is not None and entry[:2] == signature:
+                results[index] = entry[2]
+            else:
+                stale.append(index)
+            fresh_cache[relative_path] = signature
+
+        # Les fichiers sont indépendants : analyse en parallèle, fusion ici
+        if stale:
+            with ProcessPoolExecutor() as executor:
+                scanned = executor.map(_scan_file, [dart_files[i] for i in stale], chunksize=32)
+                for index, result in zip(stale, scanned):
+                    results[index] = result
+
+        for relative_path, result in zip(relative_paths, results):
+            fresh_cache[relative_path].append(result)
+            self._record_scan(relative_path, result)
+
+        self._save_cache(fresh_cache)
+
+    def _load_cache(self):
+        """Charge le cache {chemin: [mtime_ns, taille, résultat]}, vide si absent ou obsolète"""
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        if not isinstance(data, dict) or data.get('version') != _CACHE_VERSION:
+            return {}
+        return data.get('files', {})
+
+    def _save_cache(self, files):
+        """Sauvegarde le cache ; un échec d'écriture n'interrompt pas l'analyse"""
+        try:
+            with open(self.cache_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': _CACHE_VERSION, 'files': files}, f)
+        except OSError as e:
+            print(f"Cache non sauvegardé ({self.cache_path}): {e}", file=sys.stderr)
+
+    def _iter_report_lines(self):
+        """Produit le rapport d'analyse ligne par ligne"""
+        yield "=" * 80
+        yield "RAPPORT D'ANALYSE DE CONFORMITÉ CLAUDE.MD"
+        yield "=" * 80
+        yield ""
 
         # Résumé exécutif
-        report.append("### 1. RÉSUMÉ EXÉCUTIF")
-        report.append("")
-        report.append(f"Nombre total de fichiers analysés: {self.stats['total_files']}")
-        report.append(f"Total de lignes de code: {self.stats['total_lines']:,}")
-        report.append(f"Fichiers dépassant 500 lignes: {self.stats['files_over_500']}")
-        report.append(f"Méthodes dépassant 50 lignes: {self.stats['methods_over_50']}")
+        yield "### 1. RÉSUMÉ EXÉCUTIF"
+        yield ""
+        yield f"Nombre total de fichiers analysés: {self.stats['total_files']}"
+        yield f"Total de lignes de code: {self.stats['total_lines']:,}"
+        yield f"Fichiers dépassant 500 lignes: {self.stats['files_over_500']}"
+        yield f"Méthodes dépassant 50 lignes: {self.stats['methods_over_50']}"
 
         conformity = 100 - ((self.stats['files_over_500'] / max(self.stats['total_files'], 1)) * 100)
-        report.append(f"Pourcentage de conformité (fichiers): {conformity:.1f}%")
-        report.append("")
+        yield f"Pourcentage de conformité (fichiers): {conformity:.1f}%"
+        yield ""
 
         # Violations critiques
         critical_count = self.stats['files_over_500'] + self.stats['methods_over_50']
-        report.append(f"**Nombre de violations critiques: {critical_count}**")
-        report.append("")
+        yield f"**Nombre de violations critiques: {critical_count}**"
+        yield ""
 
         # Fichiers > 500 lignes
-        report.append("### 2. VIOLATIONS PAR CATÉGORIE")
-        report.append("")
-        report.append(f"#### A. Fichiers > 500 lignes ({len(self.violations['files_over_500'])} fichiers)")
-        report.append("")
-        report.append("| Fichier | Lignes | Dépassement |")
-        report.append("|---------|--------|-------------|")
+        yield "### 2. VIOLATIONS PAR CATÉGORIE"
+        yield ""
+        yield f"#### A. Fichiers > 500 lignes ({len(self.violations['files_over_500'])} fichiers)"
+        yield ""
+        yield "| Fichier | Lignes | Dépassement |"
+        yield "|---------|--------|-------------|"
 
-        for violation in sorted(self.violations['files_over_500'], key=lambda x: x['lines'], reverse=True)[:50]:
-            report.append(f"| {violation['file']} | {violation['lines']} | +{violation['excess']} |")
+        for violation in heapq.nlargest(50, self.violations['files_over_500'], key=itemgetter('lines')):
+            yield f"| {violation['file']} | {violation['lines']} | +{violation['excess']} |"
 
-        report.append("")
+        yield ""
 
         # Méthodes > 50 lignes
-        report.append(f"#### B. Méthodes > 50 lignes ({len(self.violations['methods_over_50'])} méthodes)")
-        report.append("")
-        report.append("| Fichier | Méthode | Lignes | Ligne début | Ligne fin |")
-        report.append("|---------|---------|--------|-------------|-----------|")
+        yield f"#### B. Méthodes > 50 lignes ({len(self.violations['methods_over_50'])} méthodes)"
+        yield ""
+        yield "| Fichier | Méthode | Lignes | Ligne début | Ligne fin |"
+        yield "|---------|---------|--------|-------------|-----------|"
 
-        for violation in sorted(self.violations['methods_over_50'], key=lambda x: x['lines'], reverse=True)[:100]:
-            report.append(f"| {violation['file']} | {violation['method']} | {violation['lines']} | L{violation['start_line']} | L{violation['end_line']} |")
+        for violation in heapq.nlargest(100, self.violations['methods_over_50'], key=itemgetter('lines')):
+            yield f"| {violation['file']} | {violation['method']} | {violation['lines']} | L{violation['start_line']} | L{violation['end_line']} |"
 
-        report.append("")
+        yield ""
 
         # Top 20 des fichiers prioritaires
-        report.append("### 3. TOP 20 DES FICHIERS PRIORITAIRES")
-        report.append("")
+        yield "### 3. TOP 20 DES FICHIERS PRIORITAIRES"
+        yield ""
 
         # Calculer un score d'impact pour chaque fichier
-        file_scores = defaultdict(lambda: {'score': 0, 'violations': [], 'lines': 0})
+        file_scores = {}
 
         for v in self.violations['files_over_500']:
-            file_scores[v['file']]['score'] += (v['excess'] // 100) * 10  # 10 points par tranche de 100 lignes
-            file_scores[v['file']]['violations'].append(f"Fichier trop grand: {v['lines']}L")
-            file_scores[v['file']]['lines'] = v['lines']
+            data = file_scores.get(v['file'])
+            if data is None:
+                data = file_scores[v['file']] = FileScore()
+            data.score += (v['excess'] // 100) * 10  # 10 points par tranche de 100 lignes
+            data.violations.append(f"Fichier trop grand: {v['lines']}L")
+            data.lines = v['lines']
 
         for v in self.violations['methods_over_50']:
-            file_scores[v['file']]['score'] += (v['lines'] - 50) // 10  # 1 point par tranche de 10 lignes de méthode
-            file_scores[v['file']]['violations'].append(f"Méthode {v['method']}: {v['lines']}L")
+            data = file_scores.get(v['file'])
+            if data is None:
+                data = file_scores[v['file']] = FileScore()
+            data.score += (v['lines'] - 50) // 10  # 1 point par tranche de 10 lignes de méthode
+            data.violations.append(f"Méthode {v['method']}: {v['lines']}L")
 
-        sorted_files = sorted(file_scores.items(), key=lambda x: x[1]['score'], reverse=True)[:20]
+        sorted_files = heapq.nlargest(20, file_scores.items(), key=lambda x: x[1].score)
 
-        report.append("| Rang | Fichier | Score Impact | Violations |")
-        report.append("|------|---------|--------------|------------|")
+        yield "| Rang | Fichier | Score Impact | Violations |"
+        yield "|------|---------|--------------|------------|"
 
         for rank, (file, data) in enumerate(sorted_files, 1):
-            violations_str = f"{len(data['violations'])} violation(s)"
-            report.append(f"| {rank} | {file} | {data['score']} | {violations_str} |")
+            violations_str = f"{len(data.violations)} violation(s)"
+            yield f"| {rank} | {file} | {data.score} | {violations_str} |"
+
+        yield ""
 
-        report.append("")
+    def write_report(self, out):
+        """Écrit le rapport d'analyse ligne par ligne dans un flux texte"""
+        for line in self._iter_report_lines():
+            out.write(line)
+            out.write('\n')
 
-        return "\n".join(report)
+    def generate_report(self):
+        """Génère le rapport d'analyse"""
+        return "\n".join(self._iter_report_lines())
 
     def save_json(self, output_file):
         """Sauvegarde les résultats en JSON"""
@@ -221,14 +381,12 @@ class ProjectAnalyzer:
             json.dump(data, f, indent=2, ensure_ascii=False)
 
 if __name__ == '__main__':
-    import sys
     project_path = r'C:\Users\Thibaut\Desktop\PriorisProject'
     analyzer = ProjectAnalyzer(project_path)
     print("Analyse en cours...")
     analyzer.analyze_project()
 
-    report = analyzer.generate_report()
-    print(report)
+    analyzer.write_report(sys.stdout)
 
     # Sauvegarder le JSON
     output_json = os.path.join(project_path, 'analysis_results.json')
@@ -7,8 +7,64 @@ import os
 import re
 from pathlib import Path
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 import json
 
+from dart_files import iter_dart_files
+
+# Motifs sur octets : la syntaxe Dart est ASCII, le fichier n'est pas décodé,
+# seul le nom de classe retenu l'est
+_PUBLIC_METHOD_RE = re.compile(rb'^\s*(?!_)\w+\s+\w+\s*\(', re.MULTILINE)
+_CLASS_RE = re.compile(rb'class\s+(\w+)')
+_CONCRETE_RE = re.compile(rb'=\s*(\w+)\s*\(')
+# Pas de \b en tête : il désactive la recherche rapide du préfixe littéral
+_SWITCH_HEAD_RE = re.compile(rb'switch\s*\(')
+_SWITCH_TOKEN_RE = re.compile(rb'[{}]|case ')
+
+# Heuristiques approximatives : le nom de classe, les imports et les méthodes
+# publiques se trouvent dans les premiers Ko, inutile de scanner les gros
+# fichiers générés en entier. Les switch (OCP) peuvent être plus loin dans le
+# fichier, d'où une limite plus large.
+_MAX_SCAN_BYTES = 64 * 1024
+_MAX_OCP_SCAN_BYTES = 256 * 1024
+
+# Fichiers générés (build_runner, freezed, mockito, injectable) : ils gonflent
+# les heuristiques sans refléter le code écrit à la main. Surchargeable.
+_GENERATED_SUFFIXES = ('.g.dart', '.freezed.dart', '.mocks.dart', '.config.dart')
+
+# Fenêtre examinée après chaque `switch (` : borne le coût par switch
+_SWITCH_WINDOW = 4096
+
+_SEVERITY_ORDER = {'high': 0, 'medium': 1, 'low': 2}
+
+
+def _severity_rank(violation):
+    """Clé de tri : les violations les plus sévères d'abord"""
+    return _SEVERITY_ORDER[violation['severity']]
+
+def _switch_case_count(content, start):
+    """Nombre de `case` du switch commençant à start, limité à _SWITCH_WINDOW octets
+
+    Seuls les `case` au premier niveau d'accolades comptent : ceux d'un switch
+    imbriqué sont comptés quand ce switch est examiné à son tour.
+    """
+    window = content[start:start + _SWITCH_WINDOW]
+    depth = 0
+    case_count = 0
+    for token in _SWITCH_TOKEN_RE.finditer(window):
+        token = token.group()
+        if token == b'{':
+            depth += 1
+        elif token == b'}':
+            if depth:
+                depth -= 1
+                if depth == 0:
+                    break
+        elif depth == 1:
+            case_count += 1
+    # Accolade fermante hors fenêtre : on compte sur ce qui a été vu
+    return case_count
+
 class SOLIDAnalyzer:
     def __init__(self, project_root):
         self.project_root = Path(project_root)
@@ -16,149 +72,148 @@ class SOLIDAnalyzer:
 
     def analyze_srp_violations(self):
         """Analyse des violations du Single Responsibility Principle"""
-        srp_violations = []
-
-        lib_path = self.project_root / 'lib'
-        if not lib_path.exists():
-            return srp_violations
-
-        for dart_file in lib_path.rglob('*.dart'):
-            try:
-                with open(dart_file, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-
-                relative_path = str(dart_file.relative_to(self.project_root))
-
-                # Heuristiques pour détecter SRP violations
-                # 1. Trop de méthodes publiques
-                public_methods = len(re.findall(r'^\s*(?!_)\w+\s+\w+\s*\(', content, re.MULTILINE))
-
-                # 2. Trop de dépendances (imports)
-                imports = len(re.findall(r"import\s+['\"]", content))
-
-                # 3. Classe qui fait plusieurs choses (détection de mots-clés)
-                responsibilities = 0
-                keywords = ['Repository', 'Service', 'Controller', 'Manager', 'Handler', 'Provider', 'Builder']
-                class_name_match = re.search(r'class\s+(\w+)', content)
-
-                if class_name_match:
-                    class_name = class_name_match.group(1)
-
-                    for keyword in keywords:
-                        if keyword in class_name:
-                            responsibilities += 1
-
-                    # Détection de plusieurs responsabilités
-                    if responsibilities > 1:
-                        srp_violations.append({
-                            'file': relative_path,
-                            'class': class_name,
-                            'reason': f"Classe avec plusieurs responsabilités détectées: {responsibilities}",
-                            'severity': 'high'
-                        })
-
-                    # Trop de méthodes publiques
-                    if public_methods > 15:
-                        srp_violations.append({
-                            'file': relative_path,
-                            'class': class_name,
-                            'reason': f"Trop de méthodes publiques: {public_methods}",
-                            'severity': 'medium'
-                        })
-
-                    # Trop d'imports
-                    if imports > 20:
-                        srp_violations.append({
-                            'file': relative_path,
-                            'class': class_name,
-                            'reason': f"Trop de dépendances (imports): {imports}",
-                            'severity': 'low'
-                        })
-
-            except Exception as e:
-                pass
-
-        return srp_violations
+        return self._analyze_all()[0]
 
     def analyze_dip_violations(self):
         """Analyse des violations du Dependency Inversion Principle"""
-        dip_violations = []
-
-        lib_path = self.project_root / 'lib'
-        if not lib_path.exists():
-            return dip_violations
-
-        for dart_file in lib_path.rglob('*.dart'):
-            try:
-                with open(dart_file, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-
-                relative_path = str(dart_file.relative_to(self.project_root))
-
-                # Détection de dépendances concrètes au lieu d'abstractions
-                # Chercher des constructeurs avec new ou direct instantiation
-                concrete_deps = re.findall(r'=\s*(\w+)\s*\(', content)
-
-                # Exclure les types primitifs et Flutter
-                concrete_classes = [
-                    dep for dep in concrete_deps
-                    if dep[0].isupper() and dep not in ['String', 'List', 'Map', 'Set', 'Widget', 'State']
-                ]
-
-                if len(concrete_classes) > 5:
-                    class_match = re.search(r'class\s+(\w+)', content)
-                    if class_match:
-                        dip_violations.append({
-                            'file': relative_path,
-                            'class': class_match.group(1),
-                            'reason': f"Dépendances concrètes détectées: {len(concrete_classes)}",
-                            'severity': 'medium'
-                        })
-
-            except Exception as e:
-                pass
-
-        return dip_violations
+        return self._analyze_all()[1]
 
     def analyze_ocp_violations(self):
         """Analyse des violations du Open/Closed Principle"""
-        ocp_violations = []
-
-        lib_path = self.project_root / 'lib'
-        if not lib_path.exists():
-            return ocp_violations
+        return self._analyze_all()[2]
 
-        for dart_file in lib_path.rglob('*.dart'):
-            try:
-                with open(dart_file, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-
-                relative_path = str(dart_file.relative_to(self.project_root))
-
-                # Détection de switch/if-else longs (potentiellement violant OCP)
-                switch_cases = re.findall(r'switch\s*\([^)]+\)\s*\{([^}]+)\}', content, re.DOTALL)
-                for switch_content in switch_cases:
-                    case_count = len(re.findall(r'case\s+', switch_content))
-                    if case_count > 5:
-                        class_match = re.search(r'class\s+(\w+)', content)
-                        if class_match:
-                            ocp_violations.append({
-                                'file': relative_path,
-                                'class': class_match.group(1),
-                                'reason': f"Switch avec {case_count} cas - envisager Strategy pattern",
-                                'severity': 'medium'
-                            })
+    def _analyze_all(self):
+        """Un seul parcours de lib/ : chaque fichier est lu une fois pour SRP, DIP et OCP"""
+        srp_violations = []
+        dip_violations = []
+        ocp_violations = []
 
-            except Exception as e:
-                pass
+        # Lectures de fichiers (I/O, GIL relâché) recouvertes par un pool de threads ;
+        # chaque tâche renvoie ses propres listes, fusionnées dans l'ordre ici
+        dart_files = []
+        relative_paths = []
+        for dart_file, relative_path in iter_dart_files(self.project_root, 'lib'):
+            if not dart_file.endswith(_GENERATED_SUFFIXES):
+                dart_files.append(dart_file)
+                relative_paths.append(relative_path)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for srp, dip, ocp in executor.map(self._analyze_one_file, dart_files, relative_paths):
+                srp_violations.extend(srp)
+                dip_violations.extend(dip)
+                ocp_violations.extend(ocp)
+
+        return srp_violations, dip_violations, ocp_violations
+
+    def _analyze_one_file(self, dart_file, relative_path):
+        """Violations (SRP, DIP, OCP) d'un fichier"""
+        srp_violations = []
+        dip_violations = []
+        ocp_violations = []
 
-        return ocp_violations
+        # Seule la lecture peut échouer (fichier supprimé, droits) : une erreur
+        # dans les heuristiques doit remonter
+        try:
+            with open(dart_file, 'rb') as f:
+                content = f.read(_MAX_OCP_SCAN_BYTES)
+        except OSError:
+            return srp_violations, dip_violations, ocp_violations
+        head = content[:_MAX_SCAN_BYTES]
+
+        # Toutes les violations sont rattachées à une classe : sans classe,
+        # inutile de lancer les autres heuristiques
+        class_match = _CLASS_RE.search(head)
+        # \w sur octets ne couvre que l'ASCII : décodage toujours valide
+        class_name = class_match.group(1).decode('ascii') if class_match else None
+        if class_name is not None:
+            self._srp_for_content(head, relative_path, class_name, srp_violations)
+            self._dip_for_content(head, relative_path, class_name, dip_violations)
+            self._ocp_for_content(content, relative_path, class_name, ocp_violations)
+
+        return srp_violations, dip_violations, ocp_violations
+
+    def _srp_for_content(self, content, relative_path, class_name, srp_violations):
+        """Heuristiques SRP sur le contenu d'un fichier"""
+        # Heuristiques pour détecter SRP violations
+        # 1. Trop de méthodes publiques
+        public_methods = sum(1 for _ in _PUBLIC_METHOD_RE.finditer(content))
+
+        # 2. Trop de dépendances (imports)
+        # Syntaxe Dart figée : un espace entre import et la chaîne, comptage littéral
+        imports = content.count(b"import '") + content.count(b'import "')
+
+        # 3. Classe qui fait plusieurs choses (détection de mots-clés)
+        responsibilities = 0
+        keywords = ['Repository', 'Service', 'Controller', 'Manager', 'Handler', 'Provider', 'Builder']
+
+        for keyword in keywords:
+            if keyword in class_name:
+                responsibilities += 1
+
+        # Détection de plusieurs responsabilités
+        if responsibilities > 1:
+            srp_violations.append({
+                'file': relative_path,
+                'class': class_name,
+                'reason': f"Classe avec plusieurs responsabilités détectées: {responsibilities}",
+                'severity': 'high'
+            })
+
+        # Trop de méthodes publiques
+        if public_methods > 15:
+            srp_violations.append({
+                'file': relative_path,
+                'class': class_name,
+                'reason': f"Trop de méthodes publiques: {public_methods}",
+                'severity': 'medium'
+            })
+
+        # Trop d'imports
+        if imports > 20:
+            srp_violations.append({
+                'file': relative_path,
+                'class': class_name,
+                'reason': f"Trop de dépendances (imports): {imports}",
+                'severity': 'low'
+            })
+
+    def _dip_for_content(self, content, relative_path, class_name, dip_violations):
+        """Heuristiques DIP sur le contenu d'un fichier"""
+        # Détection de dépendances concrètes au lieu d'abstractions
+        # Chercher des constructeurs avec new ou direct instantiation
+        concrete_deps = _CONCRETE_RE.findall(content)
+
+        # Exclure les types primitifs et Flutter
+        concrete_classes = [
+            dep for dep in concrete_deps
+            if dep[:1].isupper() and dep not in [b'String', b'List', b'Map', b'Set', b'Widget', b'State']
+        ]
+
+        if len(concrete_classes) > 5:
+            dip_violations.append({
+                'file': relative_path,
+                'class': class_name,
+                'reason': f"Dépendances concrètes détectées: {len(concrete_classes)}",
+                'severity': 'medium'
+            })
+
+    def _ocp_for_content(self, content, relative_path, class_name, ocp_violations):
+        """Heuristiques OCP sur le contenu d'un fichier"""
+        # Détection de switch/if-else longs (potentiellement violant OCP)
+        # Repérage du mot-clé puis appariement des accolades borné, sans regex
+        # gourmande sur tout le corps
+        for switch_match in _SWITCH_HEAD_RE.finditer(content):
+            case_count = _switch_case_count(content, switch_match.end())
+            if case_count > 5:
+                ocp_violations.append({
+                    'file': relative_path,
+                    'class': class_name,
+                    'reason': f"Switch avec {case_count} cas - envisager Strategy pattern",
+                    'severity': 'medium'
+                })
 
     def generate_report(self):
         """Generate SOLID violations report"""
-        srp = self.analyze_srp_violations()
-        dip = self.analyze_dip_violations()
-        ocp = self.analyze_ocp_violations()
+        srp, dip, ocp = self._analyze_all()
 
         report = []
         report.append("=" * 80)
@@ -172,7 +227,7 @@ class SOLIDAnalyzer:
         report.append("| Fichier | Classe | Raison | Sévérité |")
         report.append("|---------|--------|--------|----------|")
 
-        for v in sorted(srp, key=lambda x: {'high': 0, 'medium': 1, 'low': 2}[x['severity']])[:30]:
+        for v in sorted(srp, key=_severity_rank)[:30]:
             report.append(f"| {v['file']} | {v['class']} | {v['reason']} | {v['severity']} |")
 
         report.append("")
@@ -183,7 +238,7 @@ class SOLIDAnalyzer:
         report.append("| Fichier | Classe | Raison | Sévérité |")
         report.append("|---------|--------|--------|----------|")
 
-        for v in sorted(dip, key=lambda x: x['severity'])[:20]:
+        for v in sorted(dip, key=_severity_rank)[:20]:
             report.append(f"| {v['file']} | {v['class']} | {v['reason']} | {v['severity']} |")
 
         report.append("")
@@ -194,7 +249,7 @@ class SOLIDAnalyzer:
         report.append("| Fichier | Classe | Raison | Sévérité |")
         report.append("|---------|--------|--------|----------|")
 
-        for v in sorted(ocp, key=lambda x: x['severity'])[:20]:
+        for v in sorted(ocp, key=_severity_rank)[:20]:
             report.append(f"| {v['file']} | {v['class']} | {v['reason']} | {v['severity']} |")
 
         report.append("")
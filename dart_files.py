@@ -0,0 +1,41 @@
+"""
+Parcours des fichiers Dart partagé par les scripts d'analyse
+"""
+
+import os
+
+
+def walk_dart(root):
+    """Chemins .dart (str) sous root, dans l'ordre de Path.rglob, via os.scandir
+
+    Comme rglob : l'extension est comparée selon la casse de l'OS (insensible
+    sous Windows) et les dossiers illisibles sont ignorés sans erreur.
+    """
+    subdirs = []
+    try:
+        entries = os.scandir(root)
+    except PermissionError:
+        return
+    with entries:
+        for entry in entries:
+            if os.path.normcase(entry.name).endswith('.dart'):
+                yield entry.path
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+    for subdir in subdirs:
+        yield from walk_dart(subdir)
+
+
+def iter_dart_files(project_root, folder):
+    """Couples (chemin, chemin relatif à project_root) des .dart de project_root/folder
+
+    Les chemins sont construits par os.path.join sur la racine telle quelle :
+    le chemin relatif est une simple découpe de chaîne, sans relative_to().
+    """
+    root = str(project_root)
+    folder_path = os.path.join(root, folder)
+    if not os.path.isdir(folder_path):
+        return
+    prefix_len = len(os.path.join(root, ''))
+    for path in walk_dart(folder_path):
+        yield path, path[prefix_len:]
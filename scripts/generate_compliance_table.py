@@ -11,9 +11,12 @@ after revue. Output is printed to stdout or written to the chosen file.
 from __future__ import annotations
 
 import argparse
+import itertools
+import os
+import re
 import sys
 from pathlib import Path
-from typing import Iterable, List, Sequence, Tuple
+from typing import Iterable, Iterator, List, Sequence, Tuple
 
 
 def parse_args() -> argparse.Namespace:
@@ -58,46 +61,61 @@ def extract_compliance_items(path: Path) -> List[str]:
         return items
 
     try:
-        text = path.read_text(encoding="utf-8", errors="ignore")
+        with open(path, "r", encoding="utf-8", errors="ignore") as handle:
+            for raw_line in handle:
+                line = raw_line.strip()
+                if not line:
+                    continue
+                stripped = _strip_markdown_prefix(line)
+                if stripped:
+                    items.append(stripped)
     except OSError as exc:
         sys.stderr.write(f"Warning: unable to read {path}: {exc}\n")
-        return items
-
-    for raw_line in text.splitlines():
-        line = raw_line.strip()
-        if not line:
-            continue
-        stripped = _strip_markdown_prefix(line)
-        if stripped:
-            items.append(stripped)
+        return []
     return items
 
 
+_PREFIX_RE = re.compile(r"(?:- \[[xX ]\] |[-*+] |#+|\s*\d+\.*\s+)(.*)", re.DOTALL)
+
+
 def _strip_markdown_prefix(line: str) -> str:
     """Remove common Markdown list and heading prefixes and return payload."""
-    prefixes = ("- [x] ", "- [X] ", "- [ ] ", "- ", "* ", "+ ")
-    for prefix in prefixes:
-        if line.startswith(prefix):
-            return line[len(prefix) :].strip()
+    match = _PREFIX_RE.match(line)
+    return match.group(1).strip() if match else ""
 
-    if line.startswith("#"):
-        return line.lstrip("#").strip()
 
-    parts = line.split(maxsplit=1)
-    if parts and parts[0].rstrip(".").isdigit() and len(parts) == 2:
-        return parts[1].strip()
+def _walk_files(directory: str) -> Iterator[str]:
+    """Yield every file path beneath directory using cached DirEntry types.
+
+    Unreadable directories are skipped, as Path.rglob does.
+    """
+    try:
+        entries = os.scandir(directory)
+    except PermissionError:
+        return
+    with entries:
+        for entry in entries:
+            if entry.is_file():
+                yield entry.path
+            elif entry.is_dir(follow_symlinks=False):
+                yield from _walk_files(entry.path)
 
-    return ""
+
+def _path_sort_key(path: str) -> List[str]:
+    """Order paths component by component, like sorting Path objects."""
+    return os.path.normcase(path).split(os.sep)
 
 
 def gather_file_rows(root: Path, default_status: str) -> List[Tuple[str, str, str, str]]:
     """Collect every file path beneath root."""
-    rows: List[Tuple[str, str, str, str]] = []
-    for path in sorted(root.rglob("*")):
-        if path.is_file():
-            rel_path = path.relative_to(root).as_posix()
-            rows.append(("file", rel_path, "filesystem", default_status))
-    return rows
+    root_str = str(root)
+    prefix_len = len(os.path.join(root_str, ""))
+    rel_paths = [path[prefix_len:] for path in _walk_files(root_str)]
+    rel_paths.sort(key=_path_sort_key)
+    return [
+        ("file", rel_path.replace(os.sep, "/"), "filesystem", default_status)
+        for rel_path in rel_paths
+    ]
 
 
 def gather_compliance_rows(
@@ -117,15 +135,19 @@ def gather_compliance_rows(
     return rows
 
 
+# Escape pipes and flatten newlines (legal in POSIX file names) in one pass,
+# so a cell can never break its table row.
+_CELL_TRANSLATION = str.maketrans({"|": "\\|", "\n": " "})
+
+
 def _escape_table_cell(value: str) -> str:
-    return value.replace("|", "\\|")
+    return value.translate(_CELL_TRANSLATION)
 
 
-def build_table(rows: Iterable[Tuple[str, str, str, str]]) -> str:
-    lines = [
-        "| Type | Item | Source | Status |",
-        "|------|------|--------|--------|",
-    ]
+def iter_table_lines(rows: Iterable[Tuple[str, str, str, str]]) -> Iterator[str]:
+    """Yield the Markdown table one line at a time."""
+    yield "| Type | Item | Source | Status |"
+    yield "|------|------|--------|--------|"
     for entry_type, item, source, status in rows:
         cells = [
             _escape_table_cell(entry_type),
@@ -133,8 +155,11 @@ def build_table(rows: Iterable[Tuple[str, str, str, str]]) -> str:
             _escape_table_cell(source),
             _escape_table_cell(status),
         ]
-        lines.append("| " + " | ".join(cells) + " |")
-    return "\n".join(lines)
+        yield "| " + " | ".join(cells) + " |"
+
+
+def build_table(rows: Iterable[Tuple[str, str, str, str]]) -> str:
+    return "\n".join(iter_table_lines(rows))
 
 
 def main() -> None:
@@ -148,17 +173,18 @@ def main() -> None:
         root, args.compliance_files, args.default_compliance_status
     )
     file_rows = gather_file_rows(root, args.default_file_status)
-    table = build_table([*compliance_rows, *file_rows])
+    lines = iter_table_lines(itertools.chain(compliance_rows, file_rows))
 
     if args.output:
         output_path = args.output.resolve()
         try:
-            output_path.write_text(table, encoding="utf-8")
+            with open(output_path, "w", encoding="utf-8") as handle:
+                handle.writelines(line + "\n" for line in lines)
         except OSError as exc:
             sys.stderr.write(f"Error: unable to write {output_path}: {exc}\n")
             sys.exit(1)
     else:
-        print(table)
+        sys.stdout.writelines(line + "\n" for line in lines)
 
 
 if __name__ == "__main__":